@@ -12,8 +12,7 @@ class ModelOutput(OrderedDict):
 
     def __getitem__(self, k):
         if isinstance(k, str):
-            self_dict = {k: v for (k, v) in self.items()}
-            return self_dict[k]
+            return super().__getitem__(k)
         else:
             return self.to_tuple()[k]
 
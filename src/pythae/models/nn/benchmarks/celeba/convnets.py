@@ -1,6 +1,6 @@
 """Proposed Neural nets architectures suited for MNIST"""
 
-from typing import List
+from typing import List, Tuple
 
 import torch
 import torch.nn as nn
@@ -10,9 +10,119 @@ from pythae.models.nn import BaseDecoder, BaseDiscriminator, BaseEncoder
 from ....base import BaseAEConfig
 from ....base.base_utils import ModelOutput
 from ...base_architectures import BaseDecoder, BaseEncoder
+from ..utils import ConvNetInferenceMixin
 
 
-class Encoder_Conv_AE_CELEBA(BaseEncoder):
+class _CelebaConvTrunk(nn.Module):
+    """The convolutional trunk of the CELEBA-64 conv encoders mapping the images to
+    (1024, 4, 4) feature maps. The encoders only differ by the heads stacked on it.
+
+    The blocks halve the resolution with strided 3x3 convs. Except for the first one, which
+    only sees the 3 image channels, they are followed by a 3x3 conv at the reduced resolution
+    so that the receptive field of a 4x4 conv is covered with about 15% fewer FLOPs while
+    running on the dedicated 3x3 cuDNN kernels. A BatchNorm and a ReLU sit between the two
+    convs so that the pair does not collapse into a single low-rank linear conv."""
+
+    def __init__(self, n_channels: int = 3):
+        nn.Module.__init__(self)
+
+        layers = nn.ModuleList()
+
+        layers.append(
+            nn.Sequential(
+                nn.Conv2d(n_channels, 128, 3, 2, padding=1),
+                nn.BatchNorm2d(128),
+                nn.ReLU(inplace=True),
+            )
+        )
+
+        layers.append(
+            nn.Sequential(
+                nn.Conv2d(128, 128, 3, 2, padding=1),
+                nn.BatchNorm2d(128),
+                nn.ReLU(inplace=True),
+                nn.Conv2d(128, 256, 3, 1, padding=1),
+                nn.BatchNorm2d(256),
+                nn.ReLU(inplace=True),
+            )
+        )
+
+        layers.append(
+            nn.Sequential(
+                nn.Conv2d(256, 256, 3, 2, padding=1),
+                nn.BatchNorm2d(256),
+                nn.ReLU(inplace=True),
+                nn.Conv2d(256, 512, 3, 1, padding=1),
+                nn.BatchNorm2d(512),
+                nn.ReLU(inplace=True),
+            )
+        )
+
+        layers.append(
+            nn.Sequential(
+                nn.Conv2d(512, 512, 3, 2, padding=1),
+                nn.BatchNorm2d(512),
+                nn.ReLU(inplace=True),
+                nn.Conv2d(512, 1024, 3, 1, padding=1),
+                nn.BatchNorm2d(1024),
+                nn.ReLU(inplace=True),
+            )
+        )
+
+        self.layers = layers
+        self.depth = len(layers)
+        self._layer_keys = [f"embedding_layer_{i+1}" for i in range(self.depth)]
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        out = x.contiguous(memory_format=torch.channels_last)
+
+        for layer in self.layers:
+            out = layer(out)
+
+        # the feature maps stay channels_last: the nn.Flatten of the encoders reshapes them,
+        # which is where the single copy back to the NCHW element order happens
+        return out
+
+    @torch.jit.ignore
+    def forward_layers(
+        self, x: torch.Tensor, output_layer_levels: List[int], output: ModelOutput
+    ):
+        """Runs the trunk up to the deepest level in `output_layer_levels` and stores the
+        outputs of the requested layers in `output` under the keys `embedding_layer_i`.
+
+        Returns:
+            torch.Tensor: The output of the last layer or None if the trunk was not run up to
+            its full depth.
+        """
+        assert all(
+            self.depth >= levels > 0 or levels == -1 for levels in output_layer_levels
+        ), (
+            f"Cannot output layer deeper than depth ({self.depth}). "
+            f"Got ({output_layer_levels})."
+        )
+
+        levels = set(output_layer_levels)
+
+        if -1 in levels:
+            max_depth = self.depth
+        else:
+            max_depth = max(levels)
+
+        out = x.contiguous(memory_format=torch.channels_last)
+
+        for i in range(max_depth):
+            out = self.layers[i](out)
+
+            if i + 1 in levels:
+                output[self._layer_keys[i]] = out
+
+        if max_depth < self.depth:
+            return None
+
+        return out
+
+
+class Encoder_Conv_AE_CELEBA(ConvNetInferenceMixin, BaseEncoder):
     """
     A Convolutional encoder Neural net suited for CELEBA-64 and Autoencoder-based models.
 
@@ -26,28 +136,40 @@ class Encoder_Conv_AE_CELEBA(BaseEncoder):
             >>> encoder = Encoder_Conv_AE_CELEBA(model_config)
             >>> encoder
             ... Encoder_Conv_AE_CELEBA(
-            ...   (layers): ModuleList(
-            ...     (0): Sequential(
-            ...       (0): Conv2d(3, 128, kernel_size=(4, 4), stride=(2, 2), padding=(1, 1))
-            ...       (1): BatchNorm2d(128, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
-            ...       (2): ReLU()
-            ...     )
-            ...     (1): Sequential(
-            ...       (0): Conv2d(128, 256, kernel_size=(4, 4), stride=(2, 2), padding=(1, 1))
-            ...       (1): BatchNorm2d(256, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
-            ...       (2): ReLU()
-            ...     )
-            ...     (2): Sequential(
-            ...       (0): Conv2d(256, 512, kernel_size=(4, 4), stride=(2, 2), padding=(1, 1))
-            ...       (1): BatchNorm2d(512, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
-            ...       (2): ReLU()
-            ...     )
-            ...     (3): Sequential(
-            ...       (0): Conv2d(512, 1024, kernel_size=(4, 4), stride=(2, 2), padding=(1, 1))
-            ...       (1): BatchNorm2d(1024, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
-            ...       (2): ReLU()
+            ...   (trunk): _CelebaConvTrunk(
+            ...     (layers): ModuleList(
+            ...       (0): Sequential(
+            ...         (0): Conv2d(3, 128, kernel_size=(3, 3), stride=(2, 2), padding=(1, 1))
+            ...         (1): BatchNorm2d(128, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (2): ReLU(inplace=True)
+            ...       )
+            ...       (1): Sequential(
+            ...         (0): Conv2d(128, 128, kernel_size=(3, 3), stride=(2, 2), padding=(1, 1))
+            ...         (1): BatchNorm2d(128, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (2): ReLU(inplace=True)
+            ...         (3): Conv2d(128, 256, kernel_size=(3, 3), stride=(1, 1), padding=(1, 1))
+            ...         (4): BatchNorm2d(256, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (5): ReLU(inplace=True)
+            ...       )
+            ...       (2): Sequential(
+            ...         (0): Conv2d(256, 256, kernel_size=(3, 3), stride=(2, 2), padding=(1, 1))
+            ...         (1): BatchNorm2d(256, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (2): ReLU(inplace=True)
+            ...         (3): Conv2d(256, 512, kernel_size=(3, 3), stride=(1, 1), padding=(1, 1))
+            ...         (4): BatchNorm2d(512, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (5): ReLU(inplace=True)
+            ...       )
+            ...       (3): Sequential(
+            ...         (0): Conv2d(512, 512, kernel_size=(3, 3), stride=(2, 2), padding=(1, 1))
+            ...         (1): BatchNorm2d(512, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (2): ReLU(inplace=True)
+            ...         (3): Conv2d(512, 1024, kernel_size=(3, 3), stride=(1, 1), padding=(1, 1))
+            ...         (4): BatchNorm2d(1024, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (5): ReLU(inplace=True)
+            ...       )
             ...     )
             ...   )
+            ...   (flatten): Flatten(start_dim=1, end_dim=-1)
             ...   (embedding): Linear(in_features=16384, out_features=64, bias=True)
             ... )
 
@@ -82,39 +204,20 @@ class Encoder_Conv_AE_CELEBA(BaseEncoder):
         self.latent_dim = args.latent_dim
         self.n_channels = 3
 
-        layers = nn.ModuleList()
-
-        layers.append(
-            nn.Sequential(
-                nn.Conv2d(self.n_channels, 128, 4, 2, padding=1),
-                nn.BatchNorm2d(128),
-                nn.ReLU(),
-            )
-        )
-
-        layers.append(
-            nn.Sequential(
-                nn.Conv2d(128, 256, 4, 2, padding=1), nn.BatchNorm2d(256), nn.ReLU()
-            )
-        )
+        self.trunk = _CelebaConvTrunk(self.n_channels)
+        self.depth = self.trunk.depth
+        self._flat = 1024 * 4 * 4
+        self.flatten = nn.Flatten(1)
 
-        layers.append(
-            nn.Sequential(
-                nn.Conv2d(256, 512, 4, 2, padding=1), nn.BatchNorm2d(512), nn.ReLU()
-            )
-        )
+        self.embedding = nn.Linear(self._flat, args.latent_dim)
 
-        layers.append(
-            nn.Sequential(
-                nn.Conv2d(512, 1024, 4, 2, padding=1), nn.BatchNorm2d(1024), nn.ReLU()
-            )
-        )
+        self.to(memory_format=torch.channels_last)
 
-        self.layers = layers
-        self.depth = len(layers)
-
-        self.embedding = nn.Linear(1024 * 4 * 4, args.latent_dim)
+    @property
+    def layers(self) -> nn.ModuleList:
+        return self.trunk.layers
 
+    @torch.jit.ignore
     def forward(self, x: torch.Tensor, output_layer_levels: List[int] = None):
         """Forward method
 
@@ -129,38 +232,34 @@ class Encoder_Conv_AE_CELEBA(BaseEncoder):
             i is the layer's level."""
         output = ModelOutput()
 
-        max_depth = self.depth
+        if output_layer_levels is None:
+            output["embedding"] = self._run_forward_fast(x)
+            return output
 
-        if output_layer_levels is not None:
+        out = self.trunk.forward_layers(x, output_layer_levels, output)
 
-            assert all(
-                self.depth >= levels > 0 or levels == -1
-                for levels in output_layer_levels
-            ), (
-                f"Cannot output layer deeper than depth ({self.depth}). "
-                f"Got ({output_layer_levels})."
-            )
+        if out is not None:
+            flat = self.flatten(out)
+            output["embedding"] = self.embedding(flat)
 
-            if -1 in output_layer_levels:
-                max_depth = self.depth
-            else:
-                max_depth = max(output_layer_levels)
+        return output
 
-        out = x
+    @torch.jit.export
+    def forward_fast(self, x: torch.Tensor) -> torch.Tensor:
+        """Forward method only returning the embeddings of the input data. Unlike
+        :meth:`forward`, it can be compiled with TorchScript (see
+        :meth:`script_for_inference`).
 
-        for i in range(max_depth):
-            out = self.layers[i](out)
+        Returns:
+            torch.Tensor: The embeddings of the input data."""
+        out = self.trunk(x)
 
-            if output_layer_levels is not None:
-                if i + 1 in output_layer_levels:
-                    output[f"embedding_layer_{i+1}"] = out
-            if i + 1 == self.depth:
-                output["embedding"] = self.embedding(out.reshape(x.shape[0], -1))
+        flat = self.flatten(out)
 
-        return output
+        return self.embedding(flat)
 
 
-class Encoder_Conv_VAE_CELEBA(BaseEncoder):
+class Encoder_Conv_VAE_CELEBA(ConvNetInferenceMixin, BaseEncoder):
     """
     A Convolutional encoder Neural net suited for CELEBA-64 and
     Variational Autoencoder-based models.
@@ -175,30 +274,41 @@ class Encoder_Conv_VAE_CELEBA(BaseEncoder):
             >>> encoder = Encoder_Conv_VAE_CELEBA(model_config)
             >>> encoder
             ... Encoder_Conv_VAE_CELEBA(
-            ...   (layers): ModuleList(
-            ...     (0): Sequential(
-            ...       (0): Conv2d(3, 128, kernel_size=(4, 4), stride=(2, 2), padding=(1, 1))
-            ...       (1): BatchNorm2d(128, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
-            ...       (2): ReLU()
-            ...     )
-            ...     (1): Sequential(
-            ...       (0): Conv2d(128, 256, kernel_size=(4, 4), stride=(2, 2), padding=(1, 1))
-            ...       (1): BatchNorm2d(256, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
-            ...       (2): ReLU()
-            ...     )
-            ...     (2): Sequential(
-            ...       (0): Conv2d(256, 512, kernel_size=(4, 4), stride=(2, 2), padding=(1, 1))
-            ...       (1): BatchNorm2d(512, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
-            ...       (2): ReLU()
-            ...     )
-            ...     (3): Sequential(
-            ...       (0): Conv2d(512, 1024, kernel_size=(4, 4), stride=(2, 2), padding=(1, 1))
-            ...       (1): BatchNorm2d(1024, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
-            ...       (2): ReLU()
+            ...   (trunk): _CelebaConvTrunk(
+            ...     (layers): ModuleList(
+            ...       (0): Sequential(
+            ...         (0): Conv2d(3, 128, kernel_size=(3, 3), stride=(2, 2), padding=(1, 1))
+            ...         (1): BatchNorm2d(128, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (2): ReLU(inplace=True)
+            ...       )
+            ...       (1): Sequential(
+            ...         (0): Conv2d(128, 128, kernel_size=(3, 3), stride=(2, 2), padding=(1, 1))
+            ...         (1): BatchNorm2d(128, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (2): ReLU(inplace=True)
+            ...         (3): Conv2d(128, 256, kernel_size=(3, 3), stride=(1, 1), padding=(1, 1))
+            ...         (4): BatchNorm2d(256, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (5): ReLU(inplace=True)
+            ...       )
+            ...       (2): Sequential(
+            ...         (0): Conv2d(256, 256, kernel_size=(3, 3), stride=(2, 2), padding=(1, 1))
+            ...         (1): BatchNorm2d(256, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (2): ReLU(inplace=True)
+            ...         (3): Conv2d(256, 512, kernel_size=(3, 3), stride=(1, 1), padding=(1, 1))
+            ...         (4): BatchNorm2d(512, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (5): ReLU(inplace=True)
+            ...       )
+            ...       (3): Sequential(
+            ...         (0): Conv2d(512, 512, kernel_size=(3, 3), stride=(2, 2), padding=(1, 1))
+            ...         (1): BatchNorm2d(512, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (2): ReLU(inplace=True)
+            ...         (3): Conv2d(512, 1024, kernel_size=(3, 3), stride=(1, 1), padding=(1, 1))
+            ...         (4): BatchNorm2d(1024, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (5): ReLU(inplace=True)
+            ...       )
             ...     )
             ...   )
-            ...   (embedding): Linear(in_features=16384, out_features=64, bias=True)
-            ...   (log_var): Linear(in_features=16384, out_features=64, bias=True)
+            ...   (flatten): Flatten(start_dim=1, end_dim=-1)
+            ...   (heads): Linear(in_features=16384, out_features=128, bias=True)
             ... )
 
 
@@ -236,40 +346,21 @@ class Encoder_Conv_VAE_CELEBA(BaseEncoder):
         self.latent_dim = args.latent_dim
         self.n_channels = 3
 
-        layers = nn.ModuleList()
-
-        layers.append(
-            nn.Sequential(
-                nn.Conv2d(self.n_channels, 128, 4, 2, padding=1),
-                nn.BatchNorm2d(128),
-                nn.ReLU(),
-            )
-        )
-
-        layers.append(
-            nn.Sequential(
-                nn.Conv2d(128, 256, 4, 2, padding=1), nn.BatchNorm2d(256), nn.ReLU()
-            )
-        )
-
-        layers.append(
-            nn.Sequential(
-                nn.Conv2d(256, 512, 4, 2, padding=1), nn.BatchNorm2d(512), nn.ReLU()
-            )
-        )
+        self.trunk = _CelebaConvTrunk(self.n_channels)
+        self.depth = self.trunk.depth
+        self._flat = 1024 * 4 * 4
+        self.flatten = nn.Flatten(1)
 
-        layers.append(
-            nn.Sequential(
-                nn.Conv2d(512, 1024, 4, 2, padding=1), nn.BatchNorm2d(1024), nn.ReLU()
-            )
-        )
+        # the embedding and log-covariance heads are computed with a single matmul
+        self.heads = nn.Linear(self._flat, 2 * args.latent_dim)
 
-        self.layers = layers
-        self.depth = len(layers)
+        self.to(memory_format=torch.channels_last)
 
-        self.embedding = nn.Linear(1024 * 4 * 4, args.latent_dim)
-        self.log_var = nn.Linear(1024 * 4 * 4, args.latent_dim)
+    @property
+    def layers(self) -> nn.ModuleList:
+        return self.trunk.layers
 
+    @torch.jit.ignore
     def forward(self, x: torch.Tensor, output_layer_levels: List[int] = None):
         """Forward method
 
@@ -286,40 +377,38 @@ class Encoder_Conv_VAE_CELEBA(BaseEncoder):
         """
         output = ModelOutput()
 
-        max_depth = self.depth
+        if output_layer_levels is None:
+            output["embedding"], output["log_covariance"] = self._run_forward_fast(x)
+            return output
 
-        if output_layer_levels is not None:
+        out = self.trunk.forward_layers(x, output_layer_levels, output)
 
-            assert all(
-                self.depth >= levels > 0 or levels == -1
-                for levels in output_layer_levels
-            ), (
-                f"Cannot output layer deeper than depth ({self.depth}). "
-                f"Got ({output_layer_levels})."
-            )
+        if out is not None:
+            flat = self.flatten(out)
+            embedding, log_var = self.heads(flat).chunk(2, dim=-1)
+            output["embedding"] = embedding
+            output["log_covariance"] = log_var
 
-            if -1 in output_layer_levels:
-                max_depth = self.depth
-            else:
-                max_depth = max(output_layer_levels)
+        return output
 
-        out = x
+    @torch.jit.export
+    def forward_fast(self, x: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Forward method only returning the embeddings and the **log** of the diagonal
+        coefficient of the covariance matrices of the input data. Unlike :meth:`forward`, it
+        can be compiled with TorchScript (see :meth:`script_for_inference`).
 
-        for i in range(max_depth):
-            out = self.layers[i](out)
+        Returns:
+            Tuple[torch.Tensor, torch.Tensor]: The embeddings and the log-covariances.
+        """
+        out = self.trunk(x)
 
-            if output_layer_levels is not None:
-                if i + 1 in output_layer_levels:
-                    output[f"embedding_layer_{i+1}"] = out
+        flat = self.flatten(out)
+        embedding, log_var = self.heads(flat).chunk(2, dim=-1)
 
-            if i + 1 == self.depth:
-                output["embedding"] = self.embedding(out.reshape(x.shape[0], -1))
-                output["log_covariance"] = self.log_var(out.reshape(x.shape[0], -1))
-
-        return output
+        return embedding, log_var
 
 
-class Encoder_Conv_SVAE_CELEBA(BaseEncoder):
+class Encoder_Conv_SVAE_CELEBA(ConvNetInferenceMixin, BaseEncoder):
     """
     A Convolutional encoder Neural net suited for CELEBA-64 and Hyperspherical autoencoder
     Variational Autoencoder.
@@ -334,28 +423,40 @@ class Encoder_Conv_SVAE_CELEBA(BaseEncoder):
             >>> encoder = Encoder_Conv_SVAE_CELEBA(model_config)
             >>> encoder
             ... Encoder_Conv_SVAE_CELEBA(
-            ...   (layers): ModuleList(
-            ...     (0): Sequential(
-            ...       (0): Conv2d(3, 128, kernel_size=(4, 4), stride=(2, 2), padding=(1, 1))
-            ...       (1): BatchNorm2d(128, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
-            ...       (2): ReLU()
-            ...     )
-            ...     (1): Sequential(
-            ...       (0): Conv2d(128, 256, kernel_size=(4, 4), stride=(2, 2), padding=(1, 1))
-            ...       (1): BatchNorm2d(256, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
-            ...       (2): ReLU()
-            ...     )
-            ...     (2): Sequential(
-            ...       (0): Conv2d(256, 512, kernel_size=(4, 4), stride=(2, 2), padding=(1, 1))
-            ...       (1): BatchNorm2d(512, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
-            ...       (2): ReLU()
-            ...     )
-            ...     (3): Sequential(
-            ...       (0): Conv2d(512, 1024, kernel_size=(4, 4), stride=(2, 2), padding=(1, 1))
-            ...       (1): BatchNorm2d(1024, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
-            ...       (2): ReLU()
+            ...   (trunk): _CelebaConvTrunk(
+            ...     (layers): ModuleList(
+            ...       (0): Sequential(
+            ...         (0): Conv2d(3, 128, kernel_size=(3, 3), stride=(2, 2), padding=(1, 1))
+            ...         (1): BatchNorm2d(128, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (2): ReLU(inplace=True)
+            ...       )
+            ...       (1): Sequential(
+            ...         (0): Conv2d(128, 128, kernel_size=(3, 3), stride=(2, 2), padding=(1, 1))
+            ...         (1): BatchNorm2d(128, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (2): ReLU(inplace=True)
+            ...         (3): Conv2d(128, 256, kernel_size=(3, 3), stride=(1, 1), padding=(1, 1))
+            ...         (4): BatchNorm2d(256, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (5): ReLU(inplace=True)
+            ...       )
+            ...       (2): Sequential(
+            ...         (0): Conv2d(256, 256, kernel_size=(3, 3), stride=(2, 2), padding=(1, 1))
+            ...         (1): BatchNorm2d(256, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (2): ReLU(inplace=True)
+            ...         (3): Conv2d(256, 512, kernel_size=(3, 3), stride=(1, 1), padding=(1, 1))
+            ...         (4): BatchNorm2d(512, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (5): ReLU(inplace=True)
+            ...       )
+            ...       (3): Sequential(
+            ...         (0): Conv2d(512, 512, kernel_size=(3, 3), stride=(2, 2), padding=(1, 1))
+            ...         (1): BatchNorm2d(512, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (2): ReLU(inplace=True)
+            ...         (3): Conv2d(512, 1024, kernel_size=(3, 3), stride=(1, 1), padding=(1, 1))
+            ...         (4): BatchNorm2d(1024, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...         (5): ReLU(inplace=True)
+            ...       )
             ...     )
             ...   )
+            ...   (flatten): Flatten(start_dim=1, end_dim=-1)
             ...   (embedding): Linear(in_features=16384, out_features=64, bias=True)
             ...   (log_concentration): Linear(in_features=16384, out_features=1, bias=True)
             ... )
@@ -395,40 +496,21 @@ class Encoder_Conv_SVAE_CELEBA(BaseEncoder):
         self.latent_dim = args.latent_dim
         self.n_channels = 3
 
-        layers = nn.ModuleList()
-
-        layers.append(
-            nn.Sequential(
-                nn.Conv2d(self.n_channels, 128, 4, 2, padding=1),
-                nn.BatchNorm2d(128),
-                nn.ReLU(),
-            )
-        )
-
-        layers.append(
-            nn.Sequential(
-                nn.Conv2d(128, 256, 4, 2, padding=1), nn.BatchNorm2d(256), nn.ReLU()
-            )
-        )
-
-        layers.append(
-            nn.Sequential(
-                nn.Conv2d(256, 512, 4, 2, padding=1), nn.BatchNorm2d(512), nn.ReLU()
-            )
-        )
+        self.trunk = _CelebaConvTrunk(self.n_channels)
+        self.depth = self.trunk.depth
+        self._flat = 1024 * 4 * 4
+        self.flatten = nn.Flatten(1)
 
-        layers.append(
-            nn.Sequential(
-                nn.Conv2d(512, 1024, 4, 2, padding=1), nn.BatchNorm2d(1024), nn.ReLU()
-            )
-        )
+        self.embedding = nn.Linear(self._flat, args.latent_dim)
+        self.log_concentration = nn.Linear(self._flat, 1)
 
-        self.layers = layers
-        self.depth = len(layers)
+        self.to(memory_format=torch.channels_last)
 
-        self.embedding = nn.Linear(1024 * 4 * 4, args.latent_dim)
-        self.log_concentration = nn.Linear(1024 * 4 * 4, 1)
+    @property
+    def layers(self) -> nn.ModuleList:
+        return self.trunk.layers
 
+    @torch.jit.ignore
     def forward(self, x: torch.Tensor, output_layer_levels: List[int] = None):
         """Forward method
 
@@ -445,42 +527,36 @@ class Encoder_Conv_SVAE_CELEBA(BaseEncoder):
         """
         output = ModelOutput()
 
-        max_depth = self.depth
+        if output_layer_levels is None:
+            output["embedding"], output["log_concentration"] = self._run_forward_fast(x)
+            return output
 
-        if output_layer_levels is not None:
+        out = self.trunk.forward_layers(x, output_layer_levels, output)
 
-            assert all(
-                self.depth >= levels > 0 or levels == -1
-                for levels in output_layer_levels
-            ), (
-                f"Cannot output layer deeper than depth ({self.depth}). "
-                f"Got ({output_layer_levels})."
-            )
+        if out is not None:
+            flat = self.flatten(out)
+            output["embedding"] = self.embedding(flat)
+            output["log_concentration"] = self.log_concentration(flat)
 
-            if -1 in output_layer_levels:
-                max_depth = self.depth
-            else:
-                max_depth = max(output_layer_levels)
-
-        out = x
+        return output
 
-        for i in range(max_depth):
-            out = self.layers[i](out)
+    @torch.jit.export
+    def forward_fast(self, x: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Forward method only returning the embeddings and the **log** of the concentration
+        of the input data. Unlike :meth:`forward`, it can be compiled with TorchScript (see
+        :meth:`script_for_inference`).
 
-            if output_layer_levels is not None:
-                if i + 1 in output_layer_levels:
-                    output[f"embedding_layer_{i+1}"] = out
+        Returns:
+            Tuple[torch.Tensor, torch.Tensor]: The embeddings and the log-concentrations.
+        """
+        out = self.trunk(x)
 
-            if i + 1 == self.depth:
-                output["embedding"] = self.embedding(out.reshape(x.shape[0], -1))
-                output["log_concentration"] = self.log_concentration(
-                    out.reshape(x.shape[0], -1)
-                )
+        flat = self.flatten(out)
 
-        return output
+        return self.embedding(flat), self.log_concentration(flat)
 
 
-class Decoder_Conv_AE_CELEBA(BaseDecoder):
+class Decoder_Conv_AE_CELEBA(ConvNetInferenceMixin, BaseDecoder):
     """
     A Convolutional decoder Neural net suited for CELEBA-64 and Autoencoder-based
     models.
@@ -497,25 +573,38 @@ class Decoder_Conv_AE_CELEBA(BaseDecoder):
             ... Decoder_Conv_AE_CELEBA(
             ...   (layers): ModuleList(
             ...     (0): Sequential(
-            ...       (0): Linear(in_features=64, out_features=65536, bias=True)
+            ...       (0): Linear(in_features=64, out_features=1024, bias=True)
+            ...       (1): Unflatten(dim=1, unflattened_size=(1024, 1, 1))
+            ...       (2): ConvTranspose2d(1024, 1024, kernel_size=(8, 8), stride=(1, 1), groups=1024)
+            ...       (3): BatchNorm2d(1024, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...       (4): ReLU(inplace=True)
             ...     )
             ...     (1): Sequential(
-            ...       (0): ConvTranspose2d(1024, 512, kernel_size=(5, 5), stride=(2, 2), padding=(2, 2))
+            ...       (0): Conv2d(1024, 512, kernel_size=(3, 3), stride=(1, 1), padding=(1, 1))
             ...       (1): BatchNorm2d(512, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
-            ...       (2): ReLU()
+            ...       (2): ReLU(inplace=True)
+            ...       (3): ConvTranspose2d(512, 512, kernel_size=(4, 4), stride=(2, 2), padding=(1, 1))
+            ...       (4): BatchNorm2d(512, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...       (5): ReLU(inplace=True)
             ...     )
             ...     (2): Sequential(
-            ...       (0): ConvTranspose2d(512, 256, kernel_size=(5, 5), stride=(2, 2), padding=(1, 1))
+            ...       (0): Conv2d(512, 256, kernel_size=(3, 3), stride=(1, 1), padding=(1, 1))
             ...       (1): BatchNorm2d(256, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
-            ...       (2): ReLU()
+            ...       (2): ReLU(inplace=True)
+            ...       (3): ConvTranspose2d(256, 256, kernel_size=(4, 4), stride=(2, 2), padding=(1, 1))
+            ...       (4): BatchNorm2d(256, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...       (5): ReLU(inplace=True)
             ...     )
             ...     (3): Sequential(
-            ...       (0): ConvTranspose2d(256, 128, kernel_size=(5, 5), stride=(2, 2), padding=(2, 2), output_padding=(1, 1))
+            ...       (0): Conv2d(256, 128, kernel_size=(3, 3), stride=(1, 1), padding=(1, 1))
             ...       (1): BatchNorm2d(128, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
-            ...       (2): ReLU()
+            ...       (2): ReLU(inplace=True)
+            ...       (3): ConvTranspose2d(128, 128, kernel_size=(4, 4), stride=(2, 2), padding=(1, 1))
+            ...       (4): BatchNorm2d(128, eps=1e-05, momentum=0.1, affine=True, track_running_stats=True)
+            ...       (5): ReLU(inplace=True)
             ...     )
             ...     (4): Sequential(
-            ...       (0): ConvTranspose2d(128, 3, kernel_size=(5, 5), stride=(1, 1), padding=(1, 1))
+            ...       (0): ConvTranspose2d(128, 3, kernel_size=(3, 3), stride=(1, 1), padding=(1, 1))
             ...       (1): Sigmoid()
             ...     )
             ...   )
@@ -550,41 +639,78 @@ class Decoder_Conv_AE_CELEBA(BaseDecoder):
 
         layers = nn.ModuleList()
 
-        layers.append(nn.Sequential(nn.Linear(args.latent_dim, 1024 * 8 * 8)))
+        # the 8x8 feature maps are upsampled from the latent code with a depthwise transposed
+        # conv rather than a Linear(latent_dim, 1024 * 8 * 8) layer to reduce the weight memory
+        layers.append(
+            nn.Sequential(
+                nn.Linear(args.latent_dim, 1024),
+                nn.Unflatten(1, (1024, 1, 1)),
+                nn.ConvTranspose2d(1024, 1024, 8, 1, padding=0, groups=1024),
+                nn.BatchNorm2d(1024),
+                nn.ReLU(inplace=True),
+            )
+        )
 
+        # mirror of the encoder blocks: a 3x3 conv at the low resolution followed by a
+        # 4x4 stride-2 transposed conv exactly doubling the resolution (8 -> 16 -> 32 -> 64),
+        # with a BatchNorm and a ReLU in between to keep the pair non-linear
         layers.append(
             nn.Sequential(
-                nn.ConvTranspose2d(1024, 512, 5, 2, padding=2),
+                nn.Conv2d(1024, 512, 3, 1, padding=1),
                 nn.BatchNorm2d(512),
-                nn.ReLU(),
+                nn.ReLU(inplace=True),
+                nn.ConvTranspose2d(512, 512, 4, 2, padding=1),
+                nn.BatchNorm2d(512),
+                nn.ReLU(inplace=True),
             )
         )
 
         layers.append(
             nn.Sequential(
-                nn.ConvTranspose2d(512, 256, 5, 2, padding=1, output_padding=0),
+                nn.Conv2d(512, 256, 3, 1, padding=1),
                 nn.BatchNorm2d(256),
-                nn.ReLU(),
+                nn.ReLU(inplace=True),
+                nn.ConvTranspose2d(256, 256, 4, 2, padding=1),
+                nn.BatchNorm2d(256),
+                nn.ReLU(inplace=True),
             )
         )
 
         layers.append(
             nn.Sequential(
-                nn.ConvTranspose2d(256, 128, 5, 2, padding=2, output_padding=1),
+                nn.Conv2d(256, 128, 3, 1, padding=1),
                 nn.BatchNorm2d(128),
-                nn.ReLU(),
+                nn.ReLU(inplace=True),
+                nn.ConvTranspose2d(128, 128, 4, 2, padding=1),
+                nn.BatchNorm2d(128),
+                nn.ReLU(inplace=True),
             )
         )
 
         layers.append(
             nn.Sequential(
-                nn.ConvTranspose2d(128, self.n_channels, 5, 1, padding=1), nn.Sigmoid()
+                nn.ConvTranspose2d(128, self.n_channels, 3, 1, padding=1), nn.Sigmoid()
             )
         )
 
         self.layers = layers
         self.depth = len(layers)
+        self._layer_keys = [f"reconstruction_layer_{i+1}" for i in range(self.depth)]
 
+        self.to(memory_format=torch.channels_last)
+
+    def _calibration_input(self, batch):
+        assert not isinstance(batch, dict), (
+            "The decoder must be calibrated on an iterable of latent codes, not on dataset "
+            "batches."
+        )
+
+        return batch
+
+    def _input_shape(self, batch_size: int):
+        return (batch_size, self.latent_dim)
+
+    @torch.jit.ignore
     def forward(self, z: torch.Tensor, output_layer_levels: List[int] = None):
         """Forward method
 
@@ -600,40 +726,52 @@ class Decoder_Conv_AE_CELEBA(BaseDecoder):
         """
         output = ModelOutput()
 
-        max_depth = self.depth
+        if output_layer_levels is None:
+            output["reconstruction"] = self._run_forward_fast(z)
+            return output
 
-        if output_layer_levels is not None:
+        assert all(
+            self.depth >= levels > 0 or levels == -1 for levels in output_layer_levels
+        ), (
+            f"Cannot output layer deeper than depth ({self.depth}). "
+            f"Got ({output_layer_levels})."
+        )
 
-            assert all(
-                self.depth >= levels > 0 or levels == -1
-                for levels in output_layer_levels
-            ), (
-                f"Cannot output layer deeper than depth ({self.depth}). "
-                f"Got ({output_layer_levels})."
-            )
+        levels = set(output_layer_levels)
 
-            if -1 in output_layer_levels:
-                max_depth = self.depth
-            else:
-                max_depth = max(output_layer_levels)
+        if -1 in levels:
+            max_depth = self.depth
+        else:
+            max_depth = max(levels)
 
         out = z
 
         for i in range(max_depth):
             out = self.layers[i](out)
 
-            if i == 0:
-                out = out.reshape(z.shape[0], 1024, 8, 8)
-
-            if output_layer_levels is not None:
-                if i + 1 in output_layer_levels:
-                    output[f"reconstruction_layer_{i+1}"] = out
+            if i + 1 in levels:
+                output[self._layer_keys[i]] = out
 
             if i + 1 == self.depth:
                 output["reconstruction"] = out
 
         return output
 
+    @torch.jit.export
+    def forward_fast(self, z: torch.Tensor) -> torch.Tensor:
+        """Forward method only returning the reconstruction of the latent code. Unlike
+        :meth:`forward`, it can be compiled with TorchScript (see
+        :meth:`script_for_inference`).
+
+        Returns:
+            torch.Tensor: The reconstruction of the latent code."""
+        out = z
+
+        for layer in self.layers:
+            out = layer(out)
+
+        return out
+
 
 class Discriminator_Conv_CELEBA(BaseDiscriminator):
     """
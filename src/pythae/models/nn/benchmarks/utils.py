@@ -1,5 +1,19 @@
+import copy
+import importlib
+from typing import Optional
+
 import torch
+import torch.ao.quantization as tq
 import torch.nn as nn
+import torch.nn.intrinsic as nni
+
+
+def torch_tensorrt_is_available():
+    return importlib.util.find_spec("torch_tensorrt") is not None
+
+
+def ipex_is_available():
+    return importlib.util.find_spec("intel_extension_for_pytorch") is not None
 
 
 class ResBlock(nn.Module):
@@ -15,3 +29,570 @@ class ResBlock(nn.Module):
 
     def forward(self, x: torch.tensor) -> torch.Tensor:
         return x + self.conv_block(x)
+
+
+def fold_bn(conv: nn.Module, bn: nn.BatchNorm2d) -> nn.Module:
+    """Returns a copy of a (transposed) convolution with the BatchNorm following it folded
+    into its weight and bias. The BatchNorm running statistics are used."""
+    fused = copy.deepcopy(conv)
+
+    with torch.no_grad():
+        scale = bn.weight / torch.sqrt(bn.running_var + bn.eps)
+        bias = conv.bias if conv.bias is not None else torch.zeros_like(bn.running_mean)
+
+        if isinstance(conv, nn.ConvTranspose2d):
+            # weights are stored as (in, out // groups, k, k) so output channels are spread
+            # over the groups
+            weight = conv.weight.reshape(
+                conv.groups, -1, *conv.weight.shape[1:]
+            ) * scale.reshape(conv.groups, 1, -1, 1, 1)
+            weight = weight.reshape(conv.weight.shape)
+
+        else:
+            weight = conv.weight * scale.reshape(-1, 1, 1, 1)
+
+        fused.weight = nn.Parameter(weight)
+        fused.bias = nn.Parameter((bias - bn.running_mean) * scale + bn.bias)
+
+    return fused
+
+
+def fuse_conv_bn(block: nn.Sequential) -> nn.Sequential:
+    """Folds each BatchNorm2d of a Sequential block into the (transposed) convolution
+    preceding it. The block must be in eval mode since the running statistics are used.
+    """
+    modules = list(block.children())
+    fused = []
+
+    i = 0
+    while i < len(modules):
+        module = modules[i]
+
+        if (
+            isinstance(module, (nn.Conv2d, nn.ConvTranspose2d))
+            and i + 1 < len(modules)
+            and isinstance(modules[i + 1], nn.BatchNorm2d)
+        ):
+            fused.append(fold_bn(module, modules[i + 1]))
+            i += 2
+
+        else:
+            fused.append(module)
+            i += 1
+
+    return nn.Sequential(*fused)
+
+
+def fuse_conv_relu(block: nn.Sequential) -> nn.Sequential:
+    """Merges each (transposed) convolution directly followed by a ReLU of a Sequential block
+    into a :class:`ConvReLU2d` module."""
+    modules = list(block.children())
+    fused = []
+
+    i = 0
+    while i < len(modules):
+        module = modules[i]
+
+        if (
+            isinstance(module, (nn.Conv2d, nn.ConvTranspose2d))
+            and i + 1 < len(modules)
+            and isinstance(modules[i + 1], nn.ReLU)
+        ):
+            fused.append(ConvReLU2d(module, modules[i + 1]))
+            i += 2
+
+        else:
+            fused.append(module)
+            i += 1
+
+    return nn.Sequential(*fused)
+
+
+class ConvReLU2d(nn.Module):
+    """A (transposed) convolution followed by a ReLU activation.
+
+    When running inference on CUDA, plain 2D convolutions are dispatched to cuDNN's fused
+    convolution + bias + ReLU kernel (``cudnnConvolutionBiasActivationForward``) so that the
+    feature map is written only once. Otherwise, and for transposed convolutions which have
+    no fused cuDNN counterpart, the convolution and the ReLU are applied one after the other.
+    This is also the case under autocast, which the fused kernel does not support.
+
+    Args:
+        conv (torch.nn.Module): The :class:`torch.nn.Conv2d` or
+            :class:`torch.nn.ConvTranspose2d` layer.
+        relu (torch.nn.Module): The ReLU activation. If None, a new one is created.
+            Default: None.
+    """
+
+    def __init__(self, conv: nn.Module, relu: nn.Module = None):
+        nn.Module.__init__(self)
+
+        self.conv = conv
+        self.relu = relu if relu is not None else nn.ReLU()
+
+        self.cudnn_fusable = (
+            type(conv) is nn.Conv2d
+            and conv.padding_mode == "zeros"
+            and not isinstance(conv.padding, str)
+        )
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        # the fused op has no autocast kernel so it only runs outside autocast regions and on
+        # inputs already matching the weights dtype
+        if (
+            self.cudnn_fusable
+            and x.is_cuda
+            and not torch.is_grad_enabled()
+            and not torch.is_autocast_enabled()
+            and x.dtype == self.conv.weight.dtype
+        ):
+            return torch.cudnn_convolution_relu(
+                x,
+                self.conv.weight,
+                self.conv.bias,
+                self.conv.stride,
+                self.conv.padding,
+                self.conv.dilation,
+                self.conv.groups,
+            )
+
+        return self.relu(self.conv(x))
+
+
+class FastForward(nn.Module):
+    """Wraps a net so that its ``forward_fast`` method is called as ``forward``. This is used
+    to hand the tensor-only forward to compilers that trace ``forward``."""
+
+    def __init__(self, net: nn.Module):
+        nn.Module.__init__(self)
+
+        self.net = net
+
+    def forward(self, x: torch.Tensor):
+        return self.net.forward_fast(x)
+
+
+_CUDA_GRAPH_ATTRS = ("_graph", "_static_in", "_static_out")
+
+
+class ConvNetInferenceMixin:
+    """Inference-time optimizations for the benchmark convolutional nets built as a
+    ``layers`` ModuleList of ``Conv -> BatchNorm -> activation`` Sequential blocks.
+
+    .. note::
+
+        The nets keep their weights in ``channels_last`` memory format so that mixed precision
+        convolutions run on Tensor Cores. For training or inference in mixed precision, wrap
+        the calls in an autocast context
+
+        .. code-block::
+
+            >>> with torch.autocast(device_type="cuda", dtype=torch.bfloat16):
+            ...     out = encoder(x)
+
+        For deployment, the weights can be cast once and for all with
+        :meth:`half_for_inference`. All the channel counts are multiples of 8 except for the 3
+        channels of the images which cuDNN pads internally, so no change is needed on the
+        input side.
+    """
+
+    def fuse_for_inference(self):
+        """Folds the BatchNorm layers into the preceding convolutions and merges the
+        ``Conv -> ReLU`` pairs into :class:`ConvReLU2d` modules so that each block runs as a
+        single fused kernel where the backend allows it. The net is put in eval mode since the
+        fused weights rely on the BatchNorm running statistics. Calling it several times is
+        a no-op.
+
+        Returns:
+            The fused net (modified in place).
+        """
+        if getattr(self, "_fused", False):
+            return self
+
+        self._clear_cuda_graph()
+        self.eval()
+
+        for i, layer in enumerate(self.layers):
+            if isinstance(layer, nn.Sequential):
+                self.layers[i] = fuse_conv_relu(fuse_conv_bn(layer))
+
+        self.to(memory_format=torch.channels_last)
+        self._fused = True
+
+        return self
+
+    def calibrate_bn(self, loader, n_batches: int = 10, freeze: bool = False):
+        """Estimates the running statistics of the BatchNorm layers on a few batches so that
+        they hold meaningful values before training starts, which also makes
+        :meth:`fuse_for_inference` effective right away. The statistics are averaged over
+        the batches without gradient computation. The batches are moved to the device of the
+        net.
+
+        Args:
+            loader (Iterable): The calibration data. Either an iterable of tensors or of
+                dict-like batches storing the inputs under the key `data`. Decoders take an
+                iterable of latent codes.
+            n_batches (int): The number of batches used for the calibration. Default: 10
+            freeze (bool): Whether to freeze the running statistics afterwards by setting the
+                BatchNorm momentum to 0. Otherwise, the previous momentum is restored so that
+                the statistics keep tracking the weights during training. Only freeze a
+                trained net calibrated for inference: freezing before training keeps the
+                statistics of the initial weights for the whole run. Default: False
+
+        Returns:
+            The calibrated net (modified in place).
+        """
+        bns = [
+            module for module in self.modules() if isinstance(module, nn.BatchNorm2d)
+        ]
+        momentums = [bn.momentum for bn in bns]
+
+        for bn in bns:
+            bn.reset_running_stats()
+            # cumulative average over the calibration batches
+            bn.momentum = None
+
+        training = self.training
+        self.train()
+
+        device = next(self.parameters()).device
+
+        with torch.no_grad():
+            for i, batch in enumerate(loader):
+                if i >= n_batches:
+                    break
+
+                self(self._calibration_input(batch).to(device))
+
+        for bn, momentum in zip(bns, momentums):
+            bn.momentum = 0.0 if freeze else momentum
+
+        self.train(training)
+
+        return self
+
+    def half_for_inference(self, dtype: torch.dtype = torch.float16):
+        """Fuses the net for inference (see :meth:`fuse_for_inference`) and casts its weights
+        to half precision, keeping them in ``channels_last`` memory format. The BatchNorm layers
+        are folded beforehand so that the folding is computed in full precision. The inputs
+        must then be given in the same dtype.
+
+        Args:
+            dtype (torch.dtype): The half precision dtype. Either ``torch.float16`` or
+                ``torch.bfloat16``. Default: torch.float16
+
+        Returns:
+            The cast net (modified in place).
+        """
+        assert dtype in (
+            torch.float16,
+            torch.bfloat16,
+        ), f"Expected `torch.float16` or `torch.bfloat16` dtype. Got ({dtype})."
+
+        self.fuse_for_inference()
+
+        return self.to(dtype=dtype, memory_format=torch.channels_last)
+
+    def quantize_for_inference(self, calib_loader, backend: str = "fbgemm"):
+        """Applies INT8 post-training static quantization to the net. The net is first fused
+        (see :meth:`fuse_for_inference`) so that the ``Conv -> ReLU`` blocks run as single
+        quantized kernels, then observed on the calibration data and converted. The inputs and
+        outputs of the net remain in float and a final Sigmoid is kept in float as well. The
+        quantized kernels run on CPU so the net and the calibration batches are moved there.
+
+        Args:
+            calib_loader (Iterable): The calibration data. Either an iterable of tensors or of
+                dict-like batches storing the inputs under the key `data`. Decoders take an
+                iterable of latent codes.
+            backend (str): The quantized engine the weights are packed for. Either
+                ``"fbgemm"`` or ``"x86"`` (x86) or ``"qnnpack"`` (ARM). The global engine
+                (``torch.backends.quantized.engine``) is only switched during the quantization.
+                Default: "fbgemm"
+
+        Returns:
+            The quantized net (modified in place).
+        """
+        assert backend in (
+            "fbgemm",
+            "qnnpack",
+            "x86",
+        ), f"Expected `fbgemm`, `qnnpack` or `x86` backend. Got ({backend})."
+        assert not getattr(self, "_quantized", False), "The net is already quantized."
+
+        self._clear_cuda_graph()
+        self.fuse_for_inference()
+        self.cpu()
+
+        for module in self.modules():
+            if isinstance(module, nn.Sequential):
+                for i, child in enumerate(module):
+                    # route the plain convs to quantized::conv2d_relu
+                    if isinstance(child, ConvReLU2d) and type(child.conv) is nn.Conv2d:
+                        module[i] = nni.ConvReLU2d(child.conv, child.relu)
+
+        # the quantization boundaries: the inputs of the first block and of the linear heads are
+        # quantized and the outputs of the last block and of the heads dequantized
+        self.layers[0] = nn.Sequential(tq.QuantStub(), *self.layers[0])
+
+        last_block = list(self.layers[-1])
+        if isinstance(last_block[-1], nn.Sigmoid):
+            last_block.insert(-1, tq.DeQuantStub())
+        else:
+            last_block.append(tq.DeQuantStub())
+        self.layers[-1] = nn.Sequential(*last_block)
+
+        for name, child in self.named_children():
+            if isinstance(child, nn.Linear):
+                setattr(
+                    self, name, nn.Sequential(tq.QuantStub(), child, tq.DeQuantStub())
+                )
+
+        self.qconfig = tq.get_default_qconfig(backend)
+
+        for module in self.modules():
+            # per-channel weight quantization is not supported for transposed convs
+            if isinstance(module, nn.ConvTranspose2d):
+                module.qconfig = tq.QConfig(
+                    activation=self.qconfig.activation,
+                    weight=tq.default_weight_observer,
+                )
+
+        # the weights are packed for the engine selected at conversion time so the previous
+        # one can be restored afterwards
+        engine = torch.backends.quantized.engine
+
+        try:
+            if engine != backend:
+                torch.backends.quantized.engine = backend
+
+            tq.prepare(self, inplace=True)
+
+            with torch.no_grad():
+                for batch in calib_loader:
+                    self(self._calibration_input(batch).cpu())
+
+            tq.convert(self, inplace=True)
+
+        finally:
+            if torch.backends.quantized.engine != engine:
+                torch.backends.quantized.engine = engine
+
+        self._quantized = True
+
+        return self
+
+    def export(
+        self,
+        batch_size: int = 32,
+        precision: Optional[torch.dtype] = None,
+        backend: str = "tensorrt",
+    ):
+        """Compiles the net ahead of time for deployment. Only ``forward_fast`` is compiled
+        (the layer outputs of ``output_layer_levels`` are not available) and the returned
+        module is called directly on the inputs. A copy of the net is compiled so that the
+        net itself is left untouched.
+
+        Args:
+            batch_size (int): The batch size the net is compiled for. Default: 32
+            precision (torch.dtype): The precision of the compiled net. ``torch.float16`` is
+                only supported on CUDA. If None, the dtype of the weights is used.
+                Default: None
+            backend (str): Either ``"tensorrt"`` to compile the net with Torch-TensorRT or
+                ``"inductor"`` to compile it with :func:`torch.compile` in ``max-autotune``
+                mode. Default: "tensorrt"
+
+        Returns:
+            torch.nn.Module: The compiled net.
+        """
+        assert backend in (
+            "tensorrt",
+            "inductor",
+        ), f"Expected `tensorrt` or `inductor` backend. Got ({backend})."
+
+        parameter = next(self.parameters())
+
+        if precision is None:
+            precision = parameter.dtype
+
+        assert precision != torch.float16 or parameter.is_cuda, (
+            "`torch.float16` precision is only supported for nets on a CUDA device. "
+            "Use `torch.bfloat16` or `torch.float32` instead."
+        )
+
+        if backend == "tensorrt":
+            if not torch_tensorrt_is_available():
+                raise ModuleNotFoundError(
+                    "`torch_tensorrt` package must be installed. Run `pip install "
+                    "torch-tensorrt` or use `backend='inductor'`"
+                )
+
+            import torch_tensorrt
+
+            return torch_tensorrt.compile(
+                FastForward(copy.deepcopy(self).eval()),
+                inputs=[
+                    torch_tensorrt.Input(self._input_shape(batch_size), dtype=precision)
+                ],
+                enabled_precisions={precision},
+            )
+
+        net = copy.deepcopy(self).eval()
+
+        if precision != torch.float32:
+            net.half_for_inference(dtype=precision)
+
+        return torch.compile(FastForward(net), mode="max-autotune", fullgraph=True)
+
+    def optimize_ipex(self, dtype: torch.dtype = torch.bfloat16):
+        """Optimizes the net for CPU inference with Intel Extension for PyTorch. IPEX folds the
+        BatchNorm layers, fuses the activations as oneDNN post-ops and reorders the conv
+        weights into the blocked layouts (e.g. ``nChw16c``) matching the AVX-512 registers. With
+        ``torch.bfloat16``, the convs use the AVX-512 BF16 instructions where available.
+
+        Args:
+            dtype (torch.dtype): The dtype of the optimized net. Either ``torch.float32`` or
+                ``torch.bfloat16``. Default: torch.bfloat16
+
+        Returns:
+            torch.nn.Module: The optimized copy of the net.
+        """
+        assert dtype in (
+            torch.float32,
+            torch.bfloat16,
+        ), f"Expected `torch.float32` or `torch.bfloat16` dtype. Got ({dtype})."
+
+        if not ipex_is_available():
+            raise ModuleNotFoundError(
+                "`intel_extension_for_pytorch` package must be installed. Run `pip install "
+                "intel-extension-for-pytorch`"
+            )
+
+        import intel_extension_for_pytorch as ipex
+
+        self.eval()
+
+        return ipex.optimize(self, dtype=dtype, level="O1")
+
+    def make_cuda_graph(self, batch_size: int):
+        """Captures ``forward_fast`` into a CUDA graph for inputs of a fixed batch size. Once
+        captured, calling the net in eval mode on such inputs without ``output_layer_levels``
+        under :func:`torch.no_grad` (or :func:`torch.inference_mode`) replays the graph instead
+        of launching each kernel from Python, which removes most of the CPU overhead at small
+        batch sizes. With gradients enabled or under autocast, the eager path is used.
+
+        .. note::
+
+            The graph is dropped whenever the modules are rebuilt or moved (e.g. by
+            :meth:`fuse_for_inference`, :meth:`half_for_inference` or ``.to()``) and it is not
+            copied nor saved with the net, so it must be captured again afterwards.
+
+        Args:
+            batch_size (int): The batch size of the inputs the graph is replayed on.
+
+        Returns:
+            The net with the captured graph (modified in place).
+        """
+        parameter = next(self.parameters())
+
+        assert (
+            parameter.is_cuda
+        ), "The net must be on a CUDA device to be captured in a CUDA graph."
+
+        self.eval()
+
+        static_in = torch.zeros(
+            self._input_shape(batch_size),
+            dtype=parameter.dtype,
+            device=parameter.device,
+        )
+
+        # warm up on a side stream so that the capture does not record lazy initializations
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+
+        with torch.cuda.stream(stream), torch.no_grad():
+            for _ in range(3):
+                self.forward_fast(static_in)
+
+        torch.cuda.current_stream().wait_stream(stream)
+
+        graph = torch.cuda.CUDAGraph()
+
+        with torch.no_grad(), torch.cuda.graph(graph):
+            static_out = self.forward_fast(static_in)
+
+        self._static_in = static_in
+        self._static_out = static_out
+        self._graph = graph
+
+        return self
+
+    def _run_forward_fast(self, x: torch.Tensor):
+        graph = getattr(self, "_graph", None)
+
+        if (
+            graph is None
+            or self.training
+            or torch.is_grad_enabled()
+            or torch.is_autocast_enabled()
+            or x.shape != self._static_in.shape
+            or x.device != self._static_in.device
+            or x.dtype != self._static_in.dtype
+        ):
+            return self.forward_fast(x)
+
+        self._static_in.copy_(x)
+        graph.replay()
+
+        if isinstance(self._static_out, tuple):
+            return tuple(out.clone() for out in self._static_out)
+
+        return self._static_out.clone()
+
+    def _clear_cuda_graph(self):
+        for name in _CUDA_GRAPH_ATTRS:
+            self.__dict__.pop(name, None)
+
+    def _apply(self, fn, *args, **kwargs):
+        # the captured graph points to the buffers of the current parameters
+        self._clear_cuda_graph()
+        return super()._apply(fn, *args, **kwargs)
+
+    def __getstate__(self):
+        # CUDA graphs can be neither copied nor pickled
+        state = self.__dict__.copy()
+
+        for name in _CUDA_GRAPH_ATTRS + ("_compiled_call_impl",):
+            state.pop(name, None)
+
+        return state
+
+    def _calibration_input(self, batch):
+        return batch["data"] if isinstance(batch, dict) else batch
+
+    def _input_shape(self, batch_size: int):
+        return (batch_size,) + tuple(self.input_dim)
+
+    def script_for_inference(self) -> torch.jit.ScriptModule:
+        """Compiles the net with TorchScript for inference. The scripted net is frozen and
+        optimized with :func:`torch.jit.optimize_for_inference`, which folds the remaining
+        BatchNorm layers and, on CPU, prepacks the convolutions for oneDNN. The net is put in
+        eval mode and training should keep using the eager net.
+
+        .. note::
+
+            Only the ``forward_fast`` method is compiled so the returned module must be
+            called through it (e.g. ``scripted.forward_fast(x)``).
+
+        Returns:
+            torch.jit.ScriptModule: The compiled net.
+        """
+        self.eval()
+
+        scripted = torch.jit.freeze(
+            torch.jit.script(self), preserved_attrs=["forward_fast"]
+        )
+
+        return torch.jit.optimize_for_inference(
+            scripted, other_methods=["forward_fast"]
+        )
@@ -1,3 +1,5 @@
+import copy
+
 import pytest
 import torch
 import numpy as np
@@ -7,6 +9,11 @@ from pythae.models.nn.benchmarks.mnist import *
 from pythae.models.nn.benchmarks.celeba import *
 from pythae.models.nn.benchmarks.cifar import *
 from pythae.models.nn.default_architectures import *
+from pythae.models.nn.benchmarks.utils import (
+    ConvReLU2d,
+    ipex_is_available,
+    torch_tensorrt_is_available,
+)
 
 device = "cuda" if torch.cuda.is_available() else "cpu"
 
@@ -1691,6 +1698,270 @@ class Test_CELEBA_ConvNets:
                 assert scores["embedding"].shape[1] == 1
 
 
+class Test_CELEBA_ConvNets_Inference:
+    @pytest.fixture(
+        params=[
+            Encoder_Conv_AE_CELEBA,
+            Encoder_Conv_VAE_CELEBA,
+            Encoder_Conv_SVAE_CELEBA,
+        ]
+    )
+    def encoder(self, request, ae_celeba_config):
+        return request.param(ae_celeba_config).to(device)
+
+    @pytest.fixture()
+    def decoder(self, ae_celeba_config):
+        return Decoder_Conv_AE_CELEBA(ae_celeba_config).to(device)
+
+    def test_fuse_for_inference(self, encoder, decoder, celeba_like_data):
+        # update the running statistics so that folding the BatchNorm is not trivial
+        with torch.no_grad():
+            embedding = encoder(celeba_like_data).embedding
+            decoder(embedding)
+
+        encoder.eval()
+        decoder.eval()
+
+        with torch.no_grad():
+            encoder_out = encoder(celeba_like_data)
+            decoder_out = decoder(encoder_out.embedding)
+
+        encoder.fuse_for_inference()
+        decoder.fuse_for_inference()
+
+        assert not any(isinstance(m, torch.nn.BatchNorm2d) for m in encoder.modules())
+        assert not any(isinstance(m, torch.nn.BatchNorm2d) for m in decoder.modules())
+        assert any(isinstance(m, ConvReLU2d) for m in encoder.modules())
+        assert any(isinstance(m, ConvReLU2d) for m in decoder.modules())
+
+        # idempotent
+        assert encoder.fuse_for_inference() is encoder
+
+        with torch.no_grad():
+            fused_encoder_out = encoder(celeba_like_data)
+            fused_decoder_out = decoder(encoder_out.embedding)
+
+        for key in encoder_out.keys():
+            assert torch.allclose(
+                encoder_out[key], fused_encoder_out[key], atol=1e-4, rtol=1e-4
+            )
+
+        assert torch.allclose(
+            decoder_out.reconstruction,
+            fused_decoder_out.reconstruction,
+            atol=1e-4,
+            rtol=1e-4,
+        )
+
+    @pytest.mark.skipif(not torch.cuda.is_available(), reason="requires a GPU")
+    def test_fuse_for_inference_autocast(self, encoder, decoder, celeba_like_data):
+        encoder.fuse_for_inference()
+        decoder.fuse_for_inference()
+
+        with torch.no_grad(), torch.autocast(device_type="cuda", dtype=torch.bfloat16):
+            embedding = encoder(celeba_like_data).embedding
+            reconstruction = decoder(embedding).reconstruction
+
+        assert embedding.dtype == torch.bfloat16
+        assert reconstruction.shape == celeba_like_data.shape
+
+    def test_script_for_inference(self, encoder, decoder, celeba_like_data):
+        encoder.eval()
+        decoder.eval()
+
+        with torch.no_grad():
+            encoder_out = encoder(celeba_like_data)
+            decoder_out = decoder(encoder_out.embedding)
+
+        scripted_encoder = encoder.script_for_inference()
+        scripted_decoder = decoder.script_for_inference()
+
+        with torch.no_grad():
+            scripted_encoder_out = scripted_encoder.forward_fast(celeba_like_data)
+            scripted_decoder_out = scripted_decoder.forward_fast(encoder_out.embedding)
+
+        if isinstance(scripted_encoder_out, tuple):
+            scripted_encoder_out = scripted_encoder_out[0]
+
+        assert torch.allclose(
+            encoder_out.embedding, scripted_encoder_out, atol=1e-4, rtol=1e-4
+        )
+        assert torch.allclose(
+            decoder_out.reconstruction, scripted_decoder_out, atol=1e-4, rtol=1e-4
+        )
+
+    def test_calibrate_bn(self, encoder, celeba_like_data):
+        bns = [m for m in encoder.modules() if isinstance(m, torch.nn.BatchNorm2d)]
+        momentums = [bn.momentum for bn in bns]
+
+        encoder.calibrate_bn([celeba_like_data.cpu()], n_batches=1)
+
+        assert [bn.momentum for bn in bns] == momentums
+        assert all(bn.num_batches_tracked == 1 for bn in bns)
+
+    def test_calibrate_bn_decoder(self, decoder, ae_celeba_config):
+        z = torch.randn(2, ae_celeba_config.latent_dim).to(device)
+
+        decoder.calibrate_bn([z], n_batches=1)
+
+        with pytest.raises(AssertionError):
+            decoder.calibrate_bn([{"data": z}])
+
+    def test_calibrate_bn_freeze(self, encoder, celeba_like_data):
+        encoder.calibrate_bn(
+            [celeba_like_data, {"data": celeba_like_data}], n_batches=1, freeze=True
+        )
+
+        bns = [m for m in encoder.modules() if isinstance(m, torch.nn.BatchNorm2d)]
+
+        assert all(bn.momentum == 0 for bn in bns)
+        assert all(bn.num_batches_tracked == 1 for bn in bns)
+        assert not all(torch.all(bn.running_mean == 0) for bn in bns)
+
+        running_means = [bn.running_mean.clone() for bn in bns]
+
+        encoder.train()
+        encoder(torch.rand_like(celeba_like_data))
+
+        assert all(
+            torch.equal(bn.running_mean, mean) for bn, mean in zip(bns, running_means)
+        )
+
+    def test_half_for_inference(self, encoder, decoder, celeba_like_data):
+        encoder.half_for_inference(dtype=torch.bfloat16)
+        decoder.half_for_inference(dtype=torch.bfloat16)
+
+        assert all(p.dtype == torch.bfloat16 for p in encoder.parameters())
+        assert all(p.dtype == torch.bfloat16 for p in decoder.parameters())
+
+        with torch.no_grad():
+            embedding = encoder(celeba_like_data.to(torch.bfloat16)).embedding
+            reconstruction = decoder(embedding).reconstruction
+
+        assert embedding.dtype == torch.bfloat16
+        assert reconstruction.shape == celeba_like_data.shape
+
+    def test_quantize_for_inference(self, encoder, decoder, celeba_like_data):
+        encoder.eval()
+        decoder.eval()
+
+        with torch.no_grad():
+            embedding = encoder(celeba_like_data).embedding
+
+        engine = torch.backends.quantized.engine
+
+        # the calibration batches stay on the device of the nets
+        encoder.quantize_for_inference([celeba_like_data, {"data": celeba_like_data}])
+        decoder.quantize_for_inference([embedding])
+
+        assert torch.backends.quantized.engine == engine
+
+        celeba_like_data = celeba_like_data.cpu()
+        embedding = embedding.cpu()
+
+        with torch.no_grad():
+            encoder_out = encoder(celeba_like_data)
+            decoder_out = decoder(embedding)
+
+        assert not encoder_out.embedding.is_quantized
+        assert encoder_out.embedding.shape == embedding.shape
+        assert not decoder_out.reconstruction.is_quantized
+        assert decoder_out.reconstruction.shape == celeba_like_data.shape
+
+        with pytest.raises(AssertionError):
+            encoder.quantize_for_inference([celeba_like_data])
+
+    def test_export_raises(self, encoder):
+        with pytest.raises(AssertionError):
+            encoder.export(backend="dummy")
+
+        if not torch_tensorrt_is_available():
+            with pytest.raises(ModuleNotFoundError):
+                encoder.export(backend="tensorrt")
+
+        if not torch.cuda.is_available():
+            with pytest.raises(AssertionError):
+                encoder.export(precision=torch.float16, backend="inductor")
+
+    def test_export_leaves_net_untouched(self, encoder):
+        encoder.train()
+        encoder.export(precision=torch.bfloat16, backend="inductor")
+
+        assert encoder.training
+        assert not getattr(encoder, "_fused", False)
+        assert all(p.dtype == torch.float32 for p in encoder.parameters())
+
+    @pytest.mark.skipif(not torch.cuda.is_available(), reason="requires a GPU")
+    def test_make_cuda_graph(self, encoder, decoder, celeba_like_data):
+        encoder.make_cuda_graph(batch_size=celeba_like_data.shape[0])
+        decoder.make_cuda_graph(batch_size=celeba_like_data.shape[0])
+
+        with torch.no_grad():
+            embedding = encoder(celeba_like_data).embedding
+            reconstruction = decoder(embedding).reconstruction
+
+            assert torch.allclose(
+                embedding,
+                encoder(celeba_like_data, output_layer_levels=[-1]).embedding,
+                atol=1e-4,
+                rtol=1e-4,
+            )
+            assert torch.allclose(
+                reconstruction,
+                decoder(embedding, output_layer_levels=[-1]).reconstruction,
+                atol=1e-4,
+                rtol=1e-4,
+            )
+
+    def test_cuda_graph_dropped(self, encoder, celeba_like_data):
+        # stand-ins for a captured graph so that this also runs without a GPU
+        encoder._graph = object()
+        encoder._static_in = torch.zeros_like(celeba_like_data, dtype=torch.float64)
+        encoder._static_out = torch.zeros(celeba_like_data.shape[0], 1)
+
+        copied = copy.deepcopy(encoder)
+
+        assert not hasattr(copied, "_graph")
+        assert not hasattr(copied, "_static_in")
+        assert hasattr(encoder, "_graph")
+
+        # replay is skipped on inputs not matching the captured dtype
+        with torch.no_grad():
+            encoder.eval()
+            embedding = encoder(celeba_like_data).embedding
+
+        assert embedding.shape[0] == celeba_like_data.shape[0]
+
+        # nor when gradients are enabled, since the replayed outputs are detached
+        encoder._static_in = torch.zeros_like(celeba_like_data)
+        embedding = encoder(celeba_like_data).embedding
+
+        assert embedding.requires_grad
+
+        encoder.fuse_for_inference()
+
+        assert not hasattr(encoder, "_graph")
+        assert not hasattr(encoder, "_static_out")
+
+        encoder._graph = object()
+        encoder.to(torch.float64)
+
+        assert not hasattr(encoder, "_graph")
+
+    def test_make_cuda_graph_raises(self, encoder):
+        if not torch.cuda.is_available():
+            with pytest.raises(AssertionError):
+                encoder.make_cuda_graph(batch_size=2)
+
+    def test_optimize_ipex_raises(self, encoder):
+        with pytest.raises(AssertionError):
+            encoder.optimize_ipex(dtype=torch.float16)
+
+        if not ipex_is_available():
+            with pytest.raises(ModuleNotFoundError):
+                encoder.optimize_ipex()
+
+
 class Test_CELEBA_ResNets:
 
     @pytest.fixture(params=[[3, 4], [np.random.randint(1, 6)], [1, 2, 4, -1], None])